@@ -6,23 +6,265 @@ Backs up Tumblr posts to markdown files using the Tumblr API v2
 
 import os
 import json
+import logging
 import requests
+from requests.adapters import HTTPAdapter
 from requests_oauthlib import OAuth1
+from urllib3.util.retry import Retry
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from pathlib import Path
-from typing import List, Dict, Any, Set, Optional
+from typing import List, Dict, Any, Iterator, Set, Optional, TextIO, Tuple
+import io
+import itertools
 import time
 import re
+import shutil
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from urllib.parse import urlparse
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library parser
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4096)
+def _url_hostname(url: str) -> str:
+    """
+    Get the lowercase hostname of a URL, cached since the same URLs are checked repeatedly
+    """
+    try:
+        return urlparse(url).hostname or ""
+    except ValueError:  # Malformed URL, e.g. an unclosed IPv6 bracket
+        return ""
+
+
+@lru_cache(maxsize=16384)
+def _format_timestamp(timestamp: int, tz: ZoneInfo) -> Tuple[str, str]:
+    """
+    Format a post timestamp as its day key (YYYY/MM/DD) and time of day (HH:MM), cached
+    since every post's timestamp is needed both for grouping and for its heading
+    """
+    date = datetime.fromtimestamp(timestamp, tz=tz)
+    return f"{date.year:04d}/{date.month:02d}/{date.day:02d}", f"{date.hour:02d}:{date.minute:02d}"
+
+
+@lru_cache(maxsize=4096)
+def _url_basename(url: str) -> str:
+    """
+    Get the filename at the end of a URL's path, cached since the same URLs are seen repeatedly
+    """
+    try:
+        return os.path.basename(urlparse(url).path)
+    except ValueError:  # Malformed URL, e.g. an unclosed IPv6 bracket
+        return ""
+
+
+def _json_loads(data: bytes) -> Any:
+    """
+    Parse JSON, using orjson when it is installed
+    """
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON, using orjson when it is installed
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter enforcing a per-minute and a per-hour request cap
+
+    Requests only wait when one of the buckets is empty, so short bursts run at full speed
+    while sustained use stays within both limits. Safe to share between threads.
+    """
+
+    def __init__(self, per_minute: int = 300, per_hour: int = 1000):
+        """
+        Initialize the rate limiter
+
+        Args:
+            per_minute: Maximum number of requests per minute
+            per_hour: Maximum number of requests per hour
+        """
+        self.per_minute = per_minute
+        self.per_hour = per_hour
+        self._minute_tokens = float(per_minute)
+        self._hour_tokens = float(per_hour)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Block until a request is allowed under both limits, then consume one token from each
+        """
+        while True:
+            with self._lock:
+                # Refill both buckets for the time elapsed since the last update
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._updated = now
+                self._minute_tokens = min(self.per_minute, self._minute_tokens + elapsed * self.per_minute / 60)
+                self._hour_tokens = min(self.per_hour, self._hour_tokens + elapsed * self.per_hour / 3600)
+
+                if self._minute_tokens >= 1 and self._hour_tokens >= 1:
+                    self._minute_tokens -= 1
+                    self._hour_tokens -= 1
+                    return
+
+                # Wait until the emptier bucket has refilled a whole token
+                wait = max((1 - self._minute_tokens) * 60 / self.per_minute,
+                           (1 - self._hour_tokens) * 3600 / self.per_hour)
+
+            # Sleep without the lock so other threads can still report headers through observe()
+            if wait >= 5:
+                logger.info("Rate limit reached, waiting %.0f seconds...", wait)
+            time.sleep(wait)
+
+    def observe(self, headers: Dict[str, str]) -> None:
+        """
+        Sync the hourly bucket with the remaining quota reported by Tumblr's rate limit headers
+
+        Args:
+            headers: Response headers from an API call
+        """
+        try:
+            remaining = int(headers["X-Ratelimit-Perhour-Remaining"])
+            reset = int(headers.get("X-Ratelimit-Perhour-Reset", 0))
+        except (KeyError, ValueError):
+            return
+
+        with self._lock:
+            self._hour_tokens = min(self._hour_tokens, remaining)
+            if remaining <= 0 and reset > 0:
+                # Set the bucket so its next token arrives exactly when the server's window resets
+                self._hour_tokens = 1 - reset * self.per_hour / 3600
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit for downloads that adapts to observed throughput
+
+    Every window the limit grows by one slot if throughput improved and shrinks by one if it
+    dropped; it is halved whenever the server pushes back with rate limiting or errors.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32, window: float = 5.0):
+        """
+        Initialize the concurrency limit
+
+        Args:
+            initial: Number of concurrent downloads to start with
+            minimum: Lowest the limit can shrink to
+            maximum: Highest the limit can grow to
+            window: Seconds of transfers measured before adjusting the limit; idle time is not counted
+        """
+        self.limit = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = window
+        self._active = 0
+        self._condition = threading.Condition()
+        # Busy time in the current window, so idle gaps between batches don't look like slow transfers
+        self._busy_since = time.monotonic()
+        self._busy_time = 0.0
+        self._window_bytes = 0
+        self._last_throughput = 0.0
+
+    def __enter__(self) -> "AdaptiveConcurrency":
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            if self._active == 0:
+                self._busy_since = time.monotonic()
+            self._active += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        with self._condition:
+            self._active -= 1
+            if self._active == 0:
+                self._busy_time += time.monotonic() - self._busy_since
+            self._condition.notify()
+
+    def record(self, num_bytes: int) -> None:
+        """
+        Record a finished transfer and adjust the limit once the window has elapsed
+
+        Args:
+            num_bytes: Number of bytes transferred
+        """
+        with self._condition:
+            self._window_bytes += num_bytes
+            now = time.monotonic()
+            elapsed = self._busy_time
+            if self._active > 0:
+                elapsed += now - self._busy_since
+            if elapsed < self.window:
+                return
+
+            throughput = self._window_bytes / elapsed
+            if throughput > self._last_throughput:
+                self.limit = min(self.maximum, self.limit + 1)
+                self._condition.notify()
+            elif throughput < self._last_throughput:
+                self.limit = max(self.minimum, self.limit - 1)
+
+            self._last_throughput = throughput
+            self._busy_since = now
+            self._busy_time = 0.0
+            self._window_bytes = 0
+
+    def throttled(self) -> None:
+        """
+        Back off after the server signalled it is overloaded
+        """
+        with self._condition:
+            self.limit = max(self.minimum, self.limit // 2)
+
 
 class TumblrBackup:
+    # Validators and bodies of API responses, reused when the server answers 304 Not Modified
+    HTTP_CACHE_FILE = ".tumblr_http_cache.json"
+
+    # Most pages kept in the HTTP cache; newest pages are the ones requested on every run
+    HTTP_CACHE_MAX_PAGES = 50
+
+    # Timestamp of the newest backed-up post per blog, used as the incremental cursor
+    STATE_FILE = ".tumblr_backup_state.json"
+
+    # Local copies of downloaded attachments keyed by URL, reused across runs for reblogged media
+    ATTACHMENT_INDEX_FILE = ".tumblr_attachment_index.json"
+
+    # Bumped whenever the index keys change meaning, so entries from older runs are discarded
+    ATTACHMENT_INDEX_VERSION = 2
+
+    # Extracts the source URL from a legacy video embed code
+    EMBED_SRC_PATTERN = re.compile(r'src="([^"]+)"')
+
+    # Hosts whose media stays linked instead of downloaded (subdomains included)
+    EXTERNAL_VIDEO_DOMAINS = frozenset({"youtube.com", "youtu.be", "vimeo.com", "instagram.com"})
+    EXTERNAL_AUDIO_DOMAINS = frozenset({"spotify.com", "soundcloud.com", "bandcamp.com"})
+    YOUTUBE_DOMAINS = frozenset({"youtube.com", "youtu.be"})
+
     def __init__(self, blog_identifier: str, api_key: str, output_dir: str = "backup",
                  download_images: bool = True, download_videos: bool = True, download_audio: bool = True,
                  consumer_secret: Optional[str] = None, oauth_token: Optional[str] = None,
                  oauth_token_secret: Optional[str] = None, incremental_hours: Optional[int] = 5,
-                 delete_after_backup: bool = False, add_to_youtube_playlist: bool = False):
+                 delete_after_backup: bool = False, add_to_youtube_playlist: bool = False,
+                 fetch_workers: int = 4, download_workers: int = 16):
         """
         Initialize the Tumblr backup tool
 
@@ -39,6 +281,8 @@ class TumblrBackup:
             incremental_hours: Only fetch posts from the last N hours (default: 5, set to None for full backup)
             delete_after_backup: Delete posts from Tumblr after successful backup (requires OAuth, default: False)
             add_to_youtube_playlist: Collect YouTube URLs and add to playlist (default: False)
+            fetch_workers: Number of concurrent API requests when fetching pages or deleting posts (default: 4)
+            download_workers: Maximum number of attachments downloaded concurrently (default: 16)
         """
         self.blog_identifier = blog_identifier
         self.api_key = api_key
@@ -52,6 +296,61 @@ class TumblrBackup:
         self.add_to_youtube_playlist = add_to_youtube_playlist
         self.youtube_urls: List[str] = []
         self.tz = ZoneInfo("Australia/Sydney")
+        self.fetch_workers = max(1, fetch_workers)
+        self.download_workers = max(1, download_workers)
+
+        # Local paths of the current day's prefetched attachments, keyed by URL
+        self._attachment_paths: Dict[str, str] = {}
+
+        # Cached API responses for conditional requests
+        self.http_cache_file = Path(self.HTTP_CACHE_FILE)
+        self._http_cache = self._load_http_cache()
+        self._http_cache_used: Set[str] = set()
+        self._http_cache_dirty = False
+        self.state_file = Path(self.STATE_FILE)
+        self.attachment_index_file = Path(self.ATTACHMENT_INDEX_FILE)
+
+        # Markdown writers for NPF content block types
+        self._npf_handlers = {
+            "text": self._write_npf_text,
+            "image": self._write_npf_image,
+            "video": self._write_npf_video,
+            "audio": self._write_npf_audio,
+            "link": self._write_npf_link,
+        }
+
+        # Markdown writers for legacy (non-NPF) post types
+        self._legacy_handlers = {
+            "text": self._write_legacy_text,
+            "photo": self._write_legacy_photo,
+            "quote": self._write_legacy_quote,
+            "link": self._write_legacy_link,
+            "video": self._write_legacy_video,
+            "audio": self._write_legacy_audio,
+        }
+
+        # Directories already created during this run
+        self._created_dirs: Set[Path] = set()
+
+        # Files downloaded during this or earlier runs, keyed by URL (without query string for Tumblr media)
+        self._downloaded: Dict[str, Path] = self._load_attachment_index()
+
+        # Number of downloads allowed in flight, tuned by observed throughput
+        self._concurrency = AdaptiveConcurrency(maximum=self.download_workers)
+
+        # Shared session so API calls and downloads reuse keep-alive connections,
+        # retrying transient failures with backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Shared by all API calls so concurrent page fetches stay within rate limits
+        self._rate_limiter = RateLimiter(per_minute=300, per_hour=1000)
 
         # OAuth credentials for private blogs
         self.consumer_secret = consumer_secret
@@ -67,10 +366,135 @@ class TumblrBackup:
                 resource_owner_key=oauth_token,
                 resource_owner_secret=oauth_token_secret
             )
-            print("Using OAuth authentication for private blog access")
+            logger.info("Using OAuth authentication for private blog access")
 
         # Create output directory if it doesn't exist
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(self.output_dir)
+
+    def _ensure_dir(self, path: Path) -> None:
+        """
+        Create a directory (and its parents) unless it was already created during this run
+
+        Args:
+            path: Directory to create
+        """
+        if path not in self._created_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(path)
+
+    def _load_http_cache(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load cached API responses from disk
+
+        Returns:
+            Dictionary mapping request keys to cached validators and response bodies
+        """
+        if not self.http_cache_file.exists():
+            return {}
+
+        try:
+            return _json_loads(self.http_cache_file.read_bytes())
+        except (OSError, ValueError) as e:
+            logger.warning("Warning: Ignoring unreadable HTTP cache: %s", e)
+            return {}
+
+    def _save_http_cache(self) -> None:
+        """
+        Save cached API responses to disk, keeping only the pages requested during this run
+        """
+        for key in [key for key in self._http_cache if key not in self._http_cache_used]:
+            del self._http_cache[key]
+            self._http_cache_dirty = True
+
+        if not self._http_cache_dirty:
+            return
+
+        # Write to a temporary file first so an interrupted run can't corrupt the cache
+        tmp_path = self.http_cache_file.with_name(self.http_cache_file.name + ".tmp")
+        try:
+            tmp_path.write_bytes(_json_dumps(self._http_cache))
+            os.replace(tmp_path, self.http_cache_file)
+            self._http_cache_dirty = False
+        except OSError as e:
+            logger.warning("Warning: Failed to save HTTP cache: %s", e)
+
+    def _load_attachment_index(self) -> Dict[str, Path]:
+        """
+        Load the index of previously downloaded attachments from disk
+
+        Returns:
+            Dictionary mapping attachment URLs (without query string for Tumblr media) to local file paths
+        """
+        self._saved_attachment_index: Dict[str, str] = {}
+        if not self.attachment_index_file.exists():
+            return {}
+
+        try:
+            index = _json_loads(self.attachment_index_file.read_bytes())
+        except (OSError, ValueError) as e:
+            logger.warning("Warning: Ignoring unreadable attachment index: %s", e)
+            return {}
+
+        # Older indexes keyed every URL without its query string, which could map different files together
+        if not isinstance(index, dict) or index.get("version") != self.ATTACHMENT_INDEX_VERSION:
+            return {}
+
+        self._saved_attachment_index = index.get("files", {})
+        return {url: Path(path) for url, path in self._saved_attachment_index.items()}
+
+    def _save_attachment_index(self) -> None:
+        """
+        Save the index of downloaded attachments to disk, dropping files that no longer exist
+        """
+        files = {url: str(path) for url, path in self._downloaded.items() if path.exists()}
+        if files == self._saved_attachment_index:
+            return
+
+        # Write to a temporary file first so an interrupted run can't corrupt the index
+        tmp_path = self.attachment_index_file.with_name(self.attachment_index_file.name + ".tmp")
+        try:
+            tmp_path.write_bytes(_json_dumps({"version": self.ATTACHMENT_INDEX_VERSION, "files": files}))
+            os.replace(tmp_path, self.attachment_index_file)
+            self._saved_attachment_index = files
+        except OSError as e:
+            logger.warning("Warning: Failed to save attachment index: %s", e)
+
+    def _load_state(self) -> Dict[str, Any]:
+        """
+        Load the incremental backup state from disk
+
+        Returns:
+            Dictionary mapping blog identifiers to their saved state
+        """
+        if not self.state_file.exists():
+            return {}
+
+        try:
+            return _json_loads(self.state_file.read_bytes())
+        except (OSError, ValueError) as e:
+            logger.warning("Warning: Ignoring unreadable backup state: %s", e)
+            return {}
+
+    def _save_last_timestamp(self, last_timestamp: int) -> None:
+        """
+        Record the timestamp of the newest backed-up post
+
+        Args:
+            last_timestamp: Unix timestamp of the newest post saved
+        """
+        state = self._load_state()
+        blog_state = state.setdefault(self.blog_identifier, {})
+        if last_timestamp <= blog_state.get("last_timestamp", 0):
+            return
+        blog_state["last_timestamp"] = last_timestamp
+
+        # Write to a temporary file first so an interrupted run can't corrupt the state
+        tmp_path = self.state_file.with_name(self.state_file.name + ".tmp")
+        try:
+            tmp_path.write_bytes(_json_dumps(state, indent=True))
+            os.replace(tmp_path, self.state_file)
+        except OSError as e:
+            logger.warning("Warning: Failed to save backup state: %s", e)
 
     def fetch_posts(self, limit: int = 20, offset: int = 0) -> Dict[str, Any] | None:
         """
@@ -94,12 +518,39 @@ class TumblrBackup:
         if not self.auth:
             params["api_key"] = self.api_key
 
+        # Ask the server to skip the body if this page hasn't changed since the last run
+        cache_key = f"{url}?limit={params['limit']}&offset={offset}"
+        cached = self._http_cache.get(cache_key)
+        self._http_cache_used.add(cache_key)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
         try:
-            response = requests.get(url, params=params, auth=self.auth)
+            self._rate_limiter.acquire()
+            response = self.session.get(url, params=params, auth=self.auth, headers=headers)
+            self._rate_limiter.observe(response.headers)
+            if response.status_code == 304 and cached:
+                return cached["body"]
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching posts: {e}")
+            data = _json_loads(response.content)
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if (etag or last_modified) and (cached or len(self._http_cache_used) <= self.HTTP_CACHE_MAX_PAGES):
+                self._http_cache[cache_key] = {"etag": etag, "last_modified": last_modified, "body": data}
+                self._http_cache_dirty = True
+            elif cached:
+                # The page changed and can no longer be validated, so stop sending stale validators
+                del self._http_cache[cache_key]
+                self._http_cache_dirty = True
+            return data
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # ValueError covers a 200 response whose body isn't valid JSON
+            logger.error("Error fetching posts: %s", e)
             return None
 
     def fetch_all_posts(self) -> List[Dict[str, Any]]:
@@ -110,17 +561,90 @@ class TumblrBackup:
         Returns:
             List of all posts
         """
-        all_posts = []
-        offset = 0
+        return list(self.iter_posts())
+
+    def iter_posts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the blog's posts newest first as their pages arrive
+        If incremental_hours is set, only fetch posts from the last N hours
+
+        Yields:
+            Post data from API
+        """
         limit = 20
 
-        # Calculate cutoff time if incremental mode
-        cutoff_timestamp = None
         if self.incremental_hours:
+            # Calculate cutoff time for incremental mode
             cutoff_timestamp = int(time.time()) - (self.incremental_hours * 3600)
-            print(f"Fetching posts from the last {self.incremental_hours} hours...")
-        else:
-            print(f"Fetching posts from {self.blog_identifier}...")
+            logger.info("Fetching posts from the last %s hours...", self.incremental_hours)
+
+            # Posts up to the newest one saved by a previous run are already backed up
+            last_timestamp = self._load_state().get(self.blog_identifier, {}).get("last_timestamp", 0)
+            if last_timestamp >= cutoff_timestamp:
+                logger.info("Resuming after the last backed-up post...")
+                cutoff_timestamp = last_timestamp + 1
+            yield from self._iter_posts_since(cutoff_timestamp, limit)
+            return
+
+        logger.info("Fetching posts from %s...", self.blog_identifier)
+
+        # Fetch the first page to learn how many posts there are
+        response = self.fetch_posts(limit=limit, offset=0)
+        if not response or "response" not in response:
+            logger.info("Total posts fetched: 0")
+            return
+
+        posts = response["response"].get("posts", [])
+        total_posts = response["response"].get("total_posts", 0)
+        seen_ids = {p.get("id_string", p.get("id")) for p in posts}
+        fetched = len(posts)
+        logger.info("Fetched %d posts so far...", fetched)
+        yield from posts
+
+        # Fetch the remaining pages concurrently, keeping only a few pages ahead of the consumer
+        offsets = iter(range(limit, total_posts, limit))
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            pending = deque(executor.submit(self.fetch_posts, limit=limit, offset=offset)
+                            for offset in itertools.islice(offsets, self.fetch_workers * 2))
+            while pending:
+                response = pending.popleft().result()
+                if not response or "response" not in response:
+                    break
+
+                posts = response["response"].get("posts", [])
+                if not posts:
+                    break
+
+                next_offset = next(offsets, None)
+                if next_offset is not None:
+                    pending.append(executor.submit(self.fetch_posts, limit=limit, offset=next_offset))
+
+                # Offsets can shift if posts are published mid-fetch, so skip duplicates
+                for post in posts:
+                    post_id = post.get("id_string", post.get("id"))
+                    if post_id not in seen_ids:
+                        seen_ids.add(post_id)
+                        fetched += 1
+                        yield post
+
+                logger.info("Fetched %d posts so far...", fetched)
+
+        self._save_http_cache()
+        logger.info("Total posts fetched: %d", fetched)
+
+    def _iter_posts_since(self, cutoff_timestamp: int, limit: int) -> Iterator[Dict[str, Any]]:
+        """
+        Yield posts newer than a cutoff, page by page until the cutoff is reached
+
+        Args:
+            cutoff_timestamp: Unix timestamp of the oldest post to include
+            limit: Number of posts to fetch per request
+
+        Yields:
+            Posts newer than the cutoff, newest first
+        """
+        fetched = 0
+        offset = 0
 
         while True:
             response = self.fetch_posts(limit=limit, offset=offset)
@@ -132,35 +656,23 @@ class TumblrBackup:
             if not posts:
                 break
 
-            # If incremental mode, filter and check if we've gone past the cutoff
-            if cutoff_timestamp:
-                # Filter posts that are newer than cutoff
-                new_posts = [p for p in posts if p.get("timestamp", 0) >= cutoff_timestamp]
-                all_posts.extend(new_posts)
-
-                # If we got fewer posts than requested, or the oldest post is before cutoff, we're done
-                if len(new_posts) < len(posts) or (posts and posts[-1].get("timestamp", 0) < cutoff_timestamp):
-                    print(f"Reached cutoff time. Total posts fetched: {len(all_posts)}")
-                    break
+            # Take the page whole only if every post is past the cutoff; a pinned post at the top
+            # of the first page can be older than the rest, so checking the last post isn't enough
+            if min(p.get("timestamp", 0) for p in posts) >= cutoff_timestamp:
+                fetched += len(posts)
+                yield from posts
             else:
-                all_posts.extend(posts)
-
-            print(f"Fetched {len(all_posts)} posts so far...")
-
-            # Check if we've fetched all posts
-            if not cutoff_timestamp:
-                total_posts = response["response"].get("total_posts", 0)
-                if len(all_posts) >= total_posts:
-                    break
+                # This page straddles the cutoff: keep only the newer posts and stop paging
+                new_posts = [p for p in posts if p.get("timestamp", 0) >= cutoff_timestamp]
+                fetched += len(new_posts)
+                logger.info("Reached cutoff time. Total posts fetched: %d", fetched)
+                yield from new_posts
+                break
 
+            logger.info("Fetched %d posts so far...", fetched)
             offset += limit
 
-            # Respect rate limits (300 per minute, 1000 per hour)
-            time.sleep(0.2)  # Small delay between requests
-
-        if not cutoff_timestamp:
-            print(f"Total posts fetched: {len(all_posts)}")
-        return all_posts
+        self._save_http_cache()
 
     def download_attachments(self, attachments_url: str, attachments_dir: Path) -> str:
         """
@@ -174,33 +686,154 @@ class TumblrBackup:
             Relative path to the saved attachments file
         """
         try:
-            # Parse URL to get filename
-            parsed_url = urlparse(attachments_url)
-            filename = os.path.basename(parsed_url.path)
-
-            # Ensure attachments directory exists
-            attachments_dir.mkdir(parents=True, exist_ok=True)
-
+            filename = _url_basename(attachments_url)
+            if not filename:
+                raise ValueError(f"no filename in {attachments_url}")
             attachments_path = attachments_dir / filename
 
             # Skip if already downloaded
             if attachments_path.exists():
                 return f"Attachments/{filename}"
 
-            # Download the attachments
-            response = requests.get(attachments_url, timeout=30, stream=True)
-            response.raise_for_status()
-
-            with open(attachments_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # Ensure attachments directory exists now that a file is going to be written to it
+            self._ensure_dir(attachments_dir)
+
+            # Reuse a copy downloaded for another day (common with reblogs) instead of fetching it again
+            url_key = attachments_url.partition("#")[0]
+            if _url_hostname(url_key).endswith(".media.tumblr.com"):
+                # Tumblr's media CDN keeps size variants in the path, so its query strings don't change the file
+                url_key = url_key.partition("?")[0]
+            existing_path = self._downloaded.get(url_key)
+            if existing_path and existing_path.exists():
+                try:
+                    os.link(existing_path, attachments_path)
+                except OSError:
+                    shutil.copy2(existing_path, attachments_path)
+                return f"Attachments/{filename}"
 
+            # Download the attachments once a concurrency slot is free
+            with self._concurrency:
+                try:
+                    response = self.session.get(attachments_url, timeout=30, stream=True)
+                except requests.exceptions.RetryError:
+                    # The server kept answering 429/5xx, so ease off for the next downloads
+                    self._concurrency.throttled()
+                    raise
+
+                # Close the streamed response on every path so its connection goes back to the pool
+                with response:
+                    response.raise_for_status()
+
+                    # Copy the body straight to disk in large blocks, decoding any gzip/deflate transfer encoding.
+                    # It goes to a .part file first so an interrupted download is never mistaken for a finished one
+                    response.raw.decode_content = True
+                    part_path = attachments_path.with_name(f"{filename}.part")
+                    try:
+                        with open(part_path, "wb") as f:
+                            shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+                            self._concurrency.record(f.tell())
+                        os.replace(part_path, attachments_path)
+                    except BaseException:
+                        part_path.unlink(missing_ok=True)
+                        raise
+
+            self._downloaded[url_key] = attachments_path
             return f"Attachments/{filename}"
 
         except Exception as e:
-            print(f"Warning: Failed to download attachments: {e}")
+            logger.warning("Warning: Failed to download attachments: %s", e)
             return attachments_url  # Return original URL as fallback
 
+    def _attachment_path(self, attachments_url: str, attachments_dir: Path) -> str:
+        """
+        Get the markdown path for an attachment, downloading it if it wasn't prefetched
+
+        Args:
+            attachments_url: URL of the attachments to download
+            attachments_dir: Directory to save the attachments file
+
+        Returns:
+            Relative path to the saved attachments file, or the original URL on failure
+        """
+        path = self._attachment_paths.get(attachments_url)
+        if path is None:
+            path = self.download_attachments(attachments_url, attachments_dir)
+        return path
+
+    def _attachment_urls(self, post: Dict[str, Any]) -> List[str]:
+        """
+        Collect the URLs of all attachments that converting a post will download
+
+        Args:
+            post: Post data from API
+
+        Returns:
+            List of attachment URLs
+        """
+        urls = []
+        trail = post.get("trail", [])
+        content = post.get("content", [])
+
+        blocks = [block for trail_item in trail for block in trail_item.get("content", [])]
+        blocks.extend(content)
+        for block in blocks:
+            block_type = block.get("type", "")
+            if block_type == "image" and self.download_images:
+                media = block.get("media", [])
+                if media and media[0].get("url", ""):
+                    urls.append(media[0]["url"])
+            elif block_type == "video" and self.download_videos:
+                url = block.get("media", {}).get("url", "")
+                if url and not self.is_external_attachments(url, "video"):
+                    urls.append(url)
+            elif block_type == "audio" and self.download_audio:
+                url = block.get("media", {}).get("url", "")
+                if url and not self.is_external_attachments(url, "audio"):
+                    urls.append(url)
+
+        # Legacy post types only apply when there is no NPF content
+        if not trail and not content:
+            post_type = post.get("type", "unknown")
+            if post_type == "photo" and self.download_images:
+                for photo in post.get("photos", []):
+                    url = photo.get("original_size", {}).get("url", "")
+                    if url:
+                        urls.append(url)
+            elif post_type == "video" and self.download_videos:
+                url = self._legacy_video_url(post)
+                if url and not self.is_external_attachments(url, "video"):
+                    urls.append(url)
+            elif post_type == "audio" and self.download_audio:
+                url = self._legacy_audio_url(post)
+                if url and not self.is_external_attachments(url, "audio"):
+                    urls.append(url)
+
+        return urls
+
+    def _prefetch_attachments(self, posts: List[Dict[str, Any]], attachments_dir: Path) -> None:
+        """
+        Download all attachments for a day's posts concurrently before converting them
+
+        Args:
+            posts: List of posts for this day
+            attachments_dir: Directory to save attachments files
+        """
+        self._attachment_paths = {}
+
+        # One download per filename, so two URLs never write the same file at once
+        urls_by_filename = {}
+        for post in posts:
+            for url in self._attachment_urls(post):
+                urls_by_filename.setdefault(_url_basename(url), url)
+
+        urls = list(urls_by_filename.values())
+        if not urls:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            paths = executor.map(lambda url: self.download_attachments(url, attachments_dir), urls)
+            self._attachment_paths = dict(zip(urls, paths))
+
     def is_external_attachments(self, url: str, attachments_type: str) -> bool:
         """
         Check if attachments URL is external (YouTube, Vimeo, Spotify, etc.)
@@ -213,9 +846,28 @@ class TumblrBackup:
             True if external, False otherwise
         """
         if attachments_type == "video":
-            return any(domain in url.lower() for domain in ['youtube.com', 'youtu.be', 'vimeo.com', 'instagram.com'])
+            return self._host_in(url, self.EXTERNAL_VIDEO_DOMAINS)
         elif attachments_type == "audio":
-            return any(domain in url.lower() for domain in ['spotify.com', 'soundcloud.com', 'bandcamp.com'])
+            return self._host_in(url, self.EXTERNAL_AUDIO_DOMAINS)
+        return False
+
+    @staticmethod
+    def _host_in(url: str, domains: frozenset) -> bool:
+        """
+        Check if a URL's host is one of the given domains or a subdomain of one
+
+        Args:
+            url: URL to check
+            domains: Set of domain names
+
+        Returns:
+            True if the host matches, False otherwise
+        """
+        host = _url_hostname(url)
+        while host:
+            if host in domains:
+                return True
+            host = host.partition(".")[2]
         return False
 
     def is_youtube_url(self, url: str) -> bool:
@@ -228,111 +880,204 @@ class TumblrBackup:
         Returns:
             True if YouTube URL, False otherwise
         """
-        return 'youtube.com' in url.lower() or 'youtu.be' in url.lower()
+        return self._host_in(url, self.YOUTUBE_DOMAINS)
 
-    def process_npf_content_blocks(self, blocks: List[Dict[str, Any]], attachments_dir: Path, quote_level: int = 0) -> List[str]:
+    def process_npf_content_blocks(self, blocks: List[Dict[str, Any]], attachments_dir: Path, out: TextIO,
+                                   quote_level: int = 0) -> None:
         """
         Process NPF content blocks and convert them to markdown
 
         Args:
             blocks: List of NPF content blocks
             attachments_dir: Directory to save attachments files
+            out: Text buffer the markdown lines are written to
             quote_level: Level of quote nesting (0 = no quotes, 1 = >, 2 = >>, etc.)
-
-        Returns:
-            List of markdown lines
         """
-        lines = []
         quote_prefix = ">" * quote_level if quote_level > 0 else ""
+        blank_line = f"{quote_prefix.rstrip()}\n"
+        handlers = self._npf_handlers
+        last = len(blocks) - 1
 
         for i, block in enumerate(blocks):
-            block_type = block.get("type", "")
+            handler = handlers.get(block.get("type"))
+            if handler is None or not handler(block, attachments_dir, out, quote_prefix):
+                continue
 
-            if block_type == "text":
-                text = block.get("text", "")
-                if text:
-                    # Handle formatting
-                    subtype = block.get("subtype", "")
-
-                    # Apply subtype formatting (headings, etc.)
-                    if subtype == "heading1":
-                        text = f"# {text}"
-                    elif subtype == "heading2":
-                        text = f"## {text}"
-                    elif subtype == "quote":
-                        text = f"> {text}"
-                    elif subtype == "indented":
-                        text = f"  {text}"
-                    elif subtype == "chat":
-                        text = f"**{text}**"
-
-                    # Split text into lines and add quote prefix to each
-                    for line in text.split("\n"):
-                        lines.append(f"{quote_prefix}{line}")
-
-                    # Add blank line after text block if not the last block
-                    if i < len(blocks) - 1:
-                        lines.append(quote_prefix.rstrip() if quote_prefix else "")
-
-            elif block_type == "image":
-                media = block.get("media", [])
-                if media:
-                    # Get the largest available size
-                    url = media[0].get("url", "")
-                    if url:
-                        if self.download_images:
-                            image_path = self.download_attachments(url, attachments_dir)
-                            lines.append(f"{quote_prefix}![Image]({image_path})")
-                        else:
-                            lines.append(f"{quote_prefix}![Image]({url})")
-
-                        # Add blank line after image if not the last block
-                        if i < len(blocks) - 1:
-                            lines.append(quote_prefix.rstrip() if quote_prefix else "")
-
-            elif block_type == "video":
-                media = block.get("media", {})
-                url = media.get("url", "")
-                if url:
-                    # Collect YouTube URLs for playlist if enabled
-                    if self.add_to_youtube_playlist and self.is_youtube_url(url):
-                        self.youtube_urls.append(url)
-
-                    if self.download_videos and not self.is_external_attachments(url, "video"):
-                        video_path = self.download_attachments(url, attachments_dir)
-                        lines.append(f"{quote_prefix}[Video]({video_path})")
-                    else:
-                        lines.append(f"{quote_prefix}[Video]({url})")
-
-                    # Add blank line after video if not the last block
-                    if i < len(blocks) - 1:
-                        lines.append(quote_prefix.rstrip() if quote_prefix else "")
-
-            elif block_type == "audio":
-                media = block.get("media", {})
-                url = media.get("url", "")
-                if url:
-                    if self.download_audio and not self.is_external_attachments(url, "audio"):
-                        audio_path = self.download_attachments(url, attachments_dir)
-                        lines.append(f"{quote_prefix}[Audio]({audio_path})")
-                    else:
-                        lines.append(f"{quote_prefix}[Audio]({url})")
-
-                    # Add blank line after audio if not the last block
-                    if i < len(blocks) - 1:
-                        lines.append(quote_prefix.rstrip() if quote_prefix else "")
-
-            elif block_type == "link":
-                url = block.get("url", "")
-                title = block.get("title", url)
-                if url:
-                    lines.append(f"{quote_prefix}[{title}]({url})")
-
-                    # Add blank line after link if not the last block
-                    if i < len(blocks) - 1:
-                        lines.append(quote_prefix.rstrip() if quote_prefix else "")
-
-        return lines
+            # Add blank line after the block if it's not the last one
+            if i < last:
+                out.write(blank_line)
+
+    def _write_npf_text(self, block: Dict[str, Any], attachments_dir: Path, out: TextIO, quote_prefix: str) -> bool:
+        """
+        Write an NPF text block as markdown
+
+        Args:
+            block: NPF content block
+            attachments_dir: Directory to save attachments files
+            out: Text buffer the markdown lines are written to
+            quote_prefix: Quote marker prepended to every line
+
+        Returns:
+            True if anything was written, False if the block was empty
+        """
+        text = block.get("text", "")
+        if not text:
+            return False
+
+        # Apply subtype formatting (headings, etc.)
+        match block.get("subtype"):
+            case "heading1":
+                text = f"# {text}"
+            case "heading2":
+                text = f"## {text}"
+            case "quote":
+                text = f"> {text}"
+            case "indented":
+                text = f"  {text}"
+            case "chat":
+                text = f"**{text}**"
+
+        # Split text into lines and add quote prefix to each
+        if quote_prefix:
+            for line in text.split("\n"):
+                out.write(f"{quote_prefix}{line}\n")
+        else:
+            out.write(f"{text}\n")
+        return True
+
+    def _write_npf_image(self, block: Dict[str, Any], attachments_dir: Path, out: TextIO, quote_prefix: str) -> bool:
+        """
+        Write an NPF image block as markdown
+
+        Args:
+            block: NPF content block
+            attachments_dir: Directory to save attachments files
+            out: Text buffer the markdown lines are written to
+            quote_prefix: Quote marker prepended to every line
+
+        Returns:
+            True if anything was written, False if the block had no URL
+        """
+        media = block.get("media", [])
+        # Get the largest available size
+        url = media[0].get("url", "") if media else ""
+        if not url:
+            return False
+
+        if self.download_images:
+            out.write(f"{quote_prefix}![Image]({self._attachment_path(url, attachments_dir)})\n")
+        else:
+            out.write(f"{quote_prefix}![Image]({url})\n")
+        return True
+
+    def _write_npf_video(self, block: Dict[str, Any], attachments_dir: Path, out: TextIO, quote_prefix: str) -> bool:
+        """
+        Write an NPF video block as markdown
+
+        Args:
+            block: NPF content block
+            attachments_dir: Directory to save attachments files
+            out: Text buffer the markdown lines are written to
+            quote_prefix: Quote marker prepended to every line
+
+        Returns:
+            True if anything was written, False if the block had no URL
+        """
+        url = block.get("media", {}).get("url", "")
+        if not url:
+            return False
+
+        # Collect YouTube URLs for playlist if enabled
+        if self.add_to_youtube_playlist and self.is_youtube_url(url):
+            self.youtube_urls.append(url)
+
+        if self.download_videos and not self.is_external_attachments(url, "video"):
+            out.write(f"{quote_prefix}[Video]({self._attachment_path(url, attachments_dir)})\n")
+        else:
+            out.write(f"{quote_prefix}[Video]({url})\n")
+        return True
+
+    def _write_npf_audio(self, block: Dict[str, Any], attachments_dir: Path, out: TextIO, quote_prefix: str) -> bool:
+        """
+        Write an NPF audio block as markdown
+
+        Args:
+            block: NPF content block
+            attachments_dir: Directory to save attachments files
+            out: Text buffer the markdown lines are written to
+            quote_prefix: Quote marker prepended to every line
+
+        Returns:
+            True if anything was written, False if the block had no URL
+        """
+        url = block.get("media", {}).get("url", "")
+        if not url:
+            return False
+
+        if self.download_audio and not self.is_external_attachments(url, "audio"):
+            out.write(f"{quote_prefix}[Audio]({self._attachment_path(url, attachments_dir)})\n")
+        else:
+            out.write(f"{quote_prefix}[Audio]({url})\n")
+        return True
+
+    def _write_npf_link(self, block: Dict[str, Any], attachments_dir: Path, out: TextIO, quote_prefix: str) -> bool:
+        """
+        Write an NPF link block as markdown
+
+        Args:
+            block: NPF content block
+            attachments_dir: Directory to save attachments files
+            out: Text buffer the markdown lines are written to
+            quote_prefix: Quote marker prepended to every line
+
+        Returns:
+            True if anything was written, False if the block had no URL
+        """
+        url = block.get("url", "")
+        if not url:
+            return False
+
+        title = block.get("title", url)
+        out.write(f"{quote_prefix}[{title}]({url})\n")
+        return True
+
+    def _legacy_video_url(self, post: Dict[str, Any]) -> str:
+        """
+        Get the video URL of a legacy video post
+
+        Args:
+            post: Post data from API
+
+        Returns:
+            Video URL, or an empty string if none was found
+        """
+        # Try to get video URL from different possible fields
+        video_url = post.get("video_url", "")
+        if not video_url and "player" in post:
+            players = post.get("player", [])
+            if players and isinstance(players, list):
+                video_url = players[-1].get("embed_code", "")
+                # Extract URL from embed code if needed
+                if video_url and "src=" in video_url:
+                    match = self.EMBED_SRC_PATTERN.search(video_url)
+                    if match:
+                        video_url = match.group(1)
+        return video_url
+
+    def _legacy_audio_url(self, post: Dict[str, Any]) -> str:
+        """
+        Get the audio URL of a legacy audio post
+
+        Args:
+            post: Post data from API
+
+        Returns:
+            Audio URL, or an empty string if none was found
+        """
+        audio_url = post.get("audio_url", "")
+        if not audio_url and "audio_source_url" in post:
+            audio_url = post.get("audio_source_url", "")
+        return audio_url
 
     def convert_to_markdown(self, post: Dict[str, Any], attachments_dir: Path, include_timestamp_heading: bool = True) -> str:
         """
@@ -344,29 +1089,39 @@ class TumblrBackup:
             include_timestamp_heading: Whether to include H2 timestamp heading
 
         Returns:
-            Markdown formatted string
+            Markdown formatted string, ending with a newline
         """
-        md_content = []
+        out = io.StringIO()
+        self.write_markdown(post, attachments_dir, out, include_timestamp_heading)
+        return out.getvalue()
 
+    def write_markdown(self, post: Dict[str, Any], attachments_dir: Path, out: TextIO,
+                       include_timestamp_heading: bool = True) -> None:
+        """
+        Write a Tumblr post as markdown to a text buffer
+
+        Args:
+            post: Post data from API
+            attachments_dir: Directory to save attachments files for this post
+            out: Text buffer the markdown lines are written to
+            include_timestamp_heading: Whether to include H2 timestamp heading
+        """
         # Header with metadata
         post_type = post.get("type", "unknown")
         # post_id = post.get("id_string", post.get("id", "unknown"))
         timestamp = post.get("timestamp", 0)
-        date = datetime.fromtimestamp(timestamp, tz=self.tz)
         tags = post.get("tags", [])
         # post_url = post.get("post_url", "")
 
         # Add timestamp as H2 heading
         if include_timestamp_heading:
-            time_str = date.strftime("%H:%M")
-            md_content.append(f"## {time_str}")
-            md_content.append("")
+            time_str = _format_timestamp(timestamp, self.tz)[1]
+            out.write(f"## {time_str}\n\n")
 
         # Add tags if present
         if tags:
             tags_line = "Tags: " + ", ".join(f"`{tag}`" for tag in tags)
-            md_content.append(tags_line)
-            md_content.append("")
+            out.write(f"{tags_line}\n\n")
 
         # Process reblog trail if it exists (for reblogs)
         trail = post.get("trail", [])
@@ -377,126 +1132,146 @@ class TumblrBackup:
                 blog_name = blog.get("name", "unknown")
 
                 # Add username header
-                md_content.append(f"{blog_name}:")
+                out.write(f"{blog_name}:\n")
 
                 # Process the content blocks with single quote level
                 trail_content = trail_item.get("content", [])
                 if trail_content:
-                    trail_lines = self.process_npf_content_blocks(trail_content, attachments_dir, quote_level=1)
-                    md_content.extend(trail_lines)
-                    md_content.append("")
+                    self.process_npf_content_blocks(trail_content, attachments_dir, out, quote_level=1)
+                    out.write("\n")
 
         # Process your own content (what you added when reblogging or original post content)
         content = post.get("content", [])
         if content:
-            content_lines = self.process_npf_content_blocks(content, attachments_dir, quote_level=0)
-            md_content.extend(content_lines)
+            self.process_npf_content_blocks(content, attachments_dir, out, quote_level=0)
 
         # Fallback to legacy post type handling if no NPF content
         if not trail and not content:
-            if post_type == "text":
-                title = post.get("title", "")
-                if title:
-                    md_content.append(f"## {title}")
-                    md_content.append("")
-                body = post.get("body", "")
-                md_content.append(body)
-
-            elif post_type == "photo":
-                caption = post.get("caption", "")
-                if caption:
-                    md_content.append(caption)
-                    md_content.append("")
-
-                photos = post.get("photos", [])
-
-                # Legacy photos field
-                for photo in photos:
-                    original_size = photo.get("original_size", {})
-                    url = original_size.get("url", "")
-                    if url:
-                        # Download image if enabled
-                        if self.download_images:
-                            image_path = self.download_attachments(url, attachments_dir)
-                            md_content.append(f"![Photo]({image_path})")
-                        else:
-                            md_content.append(f"![Photo]({url})")
-                        md_content.append("")
-
-            elif post_type == "quote":
-                text = post.get("text", "")
-                source = post.get("source", "")
-                md_content.append(f"> {text}")
-                md_content.append("")
-                if source:
-                    md_content.append(f"— {source}")
-                    md_content.append("")
-
-            elif post_type == "link":
-                title = post.get("title", "")
-                url = post.get("url", "")
-                description = post.get("description", "")
-                md_content.append(f"## [{title}]({url})")
-                md_content.append("")
-                if description:
-                    md_content.append(description)
-                    md_content.append("")
-
-            elif post_type == "video":
-                caption = post.get("caption", "")
-                if caption:
-                    md_content.append(caption)
-                    md_content.append("")
-
-                # Try to get video URL from different possible fields
-                video_url = post.get("video_url", "")
-                if not video_url and "player" in post:
-                    players = post.get("player", [])
-                    if players and isinstance(players, list):
-                        video_url = players[-1].get("embed_code", "")
-                        # Extract URL from embed code if needed
-                        if video_url and "src=" in video_url:
-                            import re
-                            match = re.search(r'src="([^"]+)"', video_url)
-                            if match:
-                                video_url = match.group(1)
-
-                if video_url:
-                    # Download video if enabled and not external
-                    if self.download_videos and not self.is_external_attachments(video_url, "video"):
-                        video_path = self.download_attachments(video_url, attachments_dir)
-                        md_content.append(f"[Video]({video_path})")
-                    else:
-                        md_content.append(f"[Video]({video_url})")
-                    md_content.append("")
-
-            elif post_type == "audio":
-                caption = post.get("caption", "")
-                artist = post.get("artist", "")
-                track_name = post.get("track_name", "")
-
-                if artist or track_name:
-                    md_content.append(f"## {artist} - {track_name}")
-                    md_content.append("")
-                if caption:
-                    md_content.append(caption)
-                    md_content.append("")
-
-                # Try to get audio URL
-                audio_url = post.get("audio_url", "")
-                if not audio_url and "audio_source_url" in post:
-                    audio_url = post.get("audio_source_url", "")
-
-                if audio_url:
-                    # Download audio if enabled and not external
-                    if self.download_audio and not self.is_external_attachments(audio_url, "audio"):
-                        audio_path = self.download_attachments(audio_url, attachments_dir)
-                        md_content.append(f"[Audio]({audio_path})")
-                    else:
-                        md_content.append(f"[Audio]({audio_url})")
-                    md_content.append("")
-
-        return "\n".join(md_content)
+            handler = self._legacy_handlers.get(post_type)
+            if handler:
+                handler(post, attachments_dir, out)
+
+    def _write_legacy_text(self, post: Dict[str, Any], attachments_dir: Path, out: TextIO) -> None:
+        """
+        Write a legacy text post as markdown
+
+        Args:
+            post: Post data from API
+            attachments_dir: Directory to save attachments files for this post
+            out: Text buffer the markdown lines are written to
+        """
+        title = post.get("title", "")
+        if title:
+            out.write(f"## {title}\n\n")
+        body = post.get("body", "")
+        out.write(f"{body}\n")
+
+    def _write_legacy_photo(self, post: Dict[str, Any], attachments_dir: Path, out: TextIO) -> None:
+        """
+        Write a legacy photo post as markdown
+
+        Args:
+            post: Post data from API
+            attachments_dir: Directory to save attachments files for this post
+            out: Text buffer the markdown lines are written to
+        """
+        caption = post.get("caption", "")
+        if caption:
+            out.write(f"{caption}\n\n")
+
+        photos = post.get("photos", [])
+
+        # Legacy photos field
+        for photo in photos:
+            original_size = photo.get("original_size", {})
+            url = original_size.get("url", "")
+            if url:
+                # Download image if enabled
+                if self.download_images:
+                    image_path = self._attachment_path(url, attachments_dir)
+                    out.write(f"![Photo]({image_path})\n\n")
+                else:
+                    out.write(f"![Photo]({url})\n\n")
+
+    def _write_legacy_quote(self, post: Dict[str, Any], attachments_dir: Path, out: TextIO) -> None:
+        """
+        Write a legacy quote post as markdown
+
+        Args:
+            post: Post data from API
+            attachments_dir: Directory to save attachments files for this post
+            out: Text buffer the markdown lines are written to
+        """
+        text = post.get("text", "")
+        source = post.get("source", "")
+        out.write(f"> {text}\n\n")
+        if source:
+            out.write(f"— {source}\n\n")
+
+    def _write_legacy_link(self, post: Dict[str, Any], attachments_dir: Path, out: TextIO) -> None:
+        """
+        Write a legacy link post as markdown
+
+        Args:
+            post: Post data from API
+            attachments_dir: Directory to save attachments files for this post
+            out: Text buffer the markdown lines are written to
+        """
+        title = post.get("title", "")
+        url = post.get("url", "")
+        description = post.get("description", "")
+        out.write(f"## [{title}]({url})\n\n")
+        if description:
+            out.write(f"{description}\n\n")
+
+    def _write_legacy_video(self, post: Dict[str, Any], attachments_dir: Path, out: TextIO) -> None:
+        """
+        Write a legacy video post as markdown
+
+        Args:
+            post: Post data from API
+            attachments_dir: Directory to save attachments files for this post
+            out: Text buffer the markdown lines are written to
+        """
+        caption = post.get("caption", "")
+        if caption:
+            out.write(f"{caption}\n\n")
+
+        video_url = self._legacy_video_url(post)
+        if video_url:
+            # Download video if enabled and not external
+            if self.download_videos and not self.is_external_attachments(video_url, "video"):
+                video_path = self._attachment_path(video_url, attachments_dir)
+                out.write(f"[Video]({video_path})\n\n")
+            else:
+                out.write(f"[Video]({video_url})\n\n")
+
+    def _write_legacy_audio(self, post: Dict[str, Any], attachments_dir: Path, out: TextIO) -> None:
+        """
+        Write a legacy audio post as markdown
+
+        Args:
+            post: Post data from API
+            attachments_dir: Directory to save attachments files for this post
+            out: Text buffer the markdown lines are written to
+        """
+        caption = post.get("caption", "")
+        artist = post.get("artist", "")
+        track_name = post.get("track_name", "")
+
+        if artist or track_name:
+            out.write(f"## {artist} - {track_name}\n\n")
+        if caption:
+            out.write(f"{caption}\n\n")
+
+        audio_url = self._legacy_audio_url(post)
+        if audio_url:
+            # Download audio if enabled and not external
+            if self.download_audio and not self.is_external_attachments(audio_url, "audio"):
+                audio_path = self._attachment_path(audio_url, attachments_dir)
+                out.write(f"[Audio]({audio_path})\n\n")
+            else:
+                out.write(f"[Audio]({audio_url})\n\n")
 
     def delete_post(self, post_id: str) -> bool:
         """
@@ -509,45 +1284,35 @@ class TumblrBackup:
             True if deletion was successful, False otherwise
         """
         if not self.auth:
-            print("Error: OAuth authentication required for deleting posts")
+            logger.error("Error: OAuth authentication required for deleting posts")
             return False
 
         url = f"{self.base_url}/blog/{self.blog_identifier}/post/delete"
         data = {"id": post_id}
 
         try:
-            response = requests.post(url, data=data, auth=self.auth)
+            self._rate_limiter.acquire()
+            response = self.session.post(url, data=data, auth=self.auth)
+            self._rate_limiter.observe(response.headers)
             response.raise_for_status()
             return True
         except requests.exceptions.RequestException as e:
-            print(f"Error deleting post {post_id}: {e}")
+            logger.error("Error deleting post %s: %s", post_id, e)
             return False
 
-    def get_daily_posts(self, posts: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    def delete_posts(self, post_ids: List[str]) -> None:
         """
-        Group posts by day
+        Delete several posts from Tumblr concurrently
 
         Args:
-            posts: List of post data from API
-
-        Returns:
-            Dictionary mapping date strings (YYYY/MM/DD) to lists of posts
+            post_ids: IDs of the posts to delete
         """
-        daily_posts = {}
-        for post in posts:
-            timestamp = post.get("timestamp", 0)
-            date = datetime.fromtimestamp(timestamp, tz=self.tz)
-            date_key = date.strftime("%Y/%m/%d")
-
-            if date_key not in daily_posts:
-                daily_posts[date_key] = []
-            daily_posts[date_key].append(post)
-
-        # Sort posts within each day by timestamp (oldest first)
-        for date_key in daily_posts:
-            daily_posts[date_key].sort(key=lambda p: p.get("timestamp", 0))
-
-        return daily_posts
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            for post_id, deleted in zip(post_ids, executor.map(self.delete_post, post_ids)):
+                if deleted:
+                    logger.info("Deleted post %s from Tumblr", post_id)
+                else:
+                    logger.warning("Failed to delete post %s", post_id)
 
     def save_daily_posts(self, date_key: str, posts: List[Dict[str, Any]]) -> None:
         """
@@ -562,7 +1327,7 @@ class TumblrBackup:
 
         # Create directory structure: yyyy/mm/
         day_dir = self.output_dir / year / month
-        day_dir.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(day_dir)
 
         # Create filename: DD.md
         filepath = day_dir / f"{day}.md"
@@ -571,85 +1336,130 @@ class TumblrBackup:
         attachments_dir = day_dir / day / "Attachments"
 
         # Check if file already exists and has content
+        append = False
         if filepath.exists():
-            with open(filepath, "r", encoding="utf-8") as f:
-                existing_content = f.read()
-                # If file has substantial content, skip (incremental backup)
-                if len(existing_content) > 10:
+            existing = filepath.stat()
+            # If file has substantial content, only add posts published after it was written (incremental backup)
+            if existing.st_size > 10:
+                backed_up_until = existing.st_mtime
+                posts = [p for p in posts if p.get("timestamp", 0) > backed_up_until]
+                if not posts:
                     return
+                append = True
 
-        # Convert all posts to markdown
-        daily_content = []
-        date_obj = datetime.strptime(date_key, "%Y/%m/%d").replace(tzinfo=self.tz)
-
-        # Add date as H1 heading
-        daily_content.append(f"# {date_obj.strftime('%Y-%m-%d')}")
-        daily_content.append("")
+        # Download the day's attachments up front so they don't block conversion
+        self._prefetch_attachments(posts, attachments_dir)
 
-        for post in posts:
-            post_md = self.convert_to_markdown(post, attachments_dir, include_timestamp_heading=True)
-            daily_content.append(post_md)
-            daily_content.append("")
-            daily_content.append("---")
-            daily_content.append("")
-
-            # Delete post from Tumblr if enabled
-            if self.delete_after_backup:
-                post_id = post.get("id_string", post.get("id", "unknown"))
-                if self.delete_post(str(post_id)):
-                    print(f"Deleted post {post_id} from Tumblr")
+        # Write the posts straight into a temporary file and swap it in once complete,
+        # so an interrupted run never leaves a partial day file behind
+        tmp_path = filepath.with_suffix(".md.tmp")
+        if append:
+            shutil.copyfile(filepath, tmp_path)
+        try:
+            with open(tmp_path, "a" if append else "w", encoding="utf-8", buffering=1 << 16) as f:
+                if append:
+                    # Continue after the posts already in the file
+                    f.write("\n---\n\n")
                 else:
-                    print(f"Failed to delete post {post_id}")
-
-        # Remove trailing separator
-        if daily_content[-1] == "" and daily_content[-2] == "---":
-            daily_content = daily_content[:-2]
-
-        # Save the markdown file
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write("\n".join(daily_content))
+                    # Add date as H1 heading
+                    f.write(f"# {date_key.replace('/', '-')}\n\n")
+
+                for i, post in enumerate(posts):
+                    # Separate posts with a horizontal rule
+                    if i > 0:
+                        f.write("\n---\n\n")
+                    self.write_markdown(post, attachments_dir, f, include_timestamp_heading=True)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        # Stamp the file with its newest post rather than the write time, so posts published
+        # while this day was being saved aren't mistaken for backed up on the next run
+        newest_timestamp = max(p.get("timestamp", 0) for p in posts)
+        os.utime(filepath, (newest_timestamp, newest_timestamp))
+
+        # Delete posts from Tumblr if enabled, only once they are safely on disk
+        if self.delete_after_backup:
+            self.delete_posts([str(post.get("id_string", post.get("id", "unknown"))) for post in posts])
 
     def backup(self) -> None:
         """
         Perform full backup of all posts
+
+        Posts are saved day by day while later pages are still being fetched, so only the
+        days still in progress are held in memory.
         """
-        posts = self.fetch_all_posts()
+        try:
+            # Deleting posts shifts the offsets of those not yet fetched, so fetch everything first
+            posts = self.fetch_all_posts() if self.delete_after_backup else self.iter_posts()
 
-        if not posts:
-            print("No posts to backup.")
-            return
+            pending_days: Dict[str, List[Dict[str, Any]]] = {}
+            saved_count = 0
+            last_timestamp = 0
+            for post in posts:
+                timestamp = post.get("timestamp", 0)
+                date_key = _format_timestamp(timestamp, self.tz)[0]
+
+                # Posts arrive newest first, so any pending day newer than this post's day is complete
+                for done_key in [key for key in pending_days if key > date_key]:
+                    self._save_pending_day(done_key, pending_days.pop(done_key))
 
-        print(f"\nSaving {len(posts)} posts to {self.output_dir}...")
+                pending_days.setdefault(date_key, []).append(post)
+                saved_count += 1
+                last_timestamp = max(last_timestamp, timestamp)
 
-        # Group posts by day
-        daily_posts = self.get_daily_posts(posts)
+            if not saved_count:
+                logger.info("No posts to backup.")
+                return
 
-        # Save each day's posts to a single file
-        for date_key, day_posts in daily_posts.items():
-            print(f"Saving {len(day_posts)} post(s) for {date_key}...")
-            self.save_daily_posts(date_key, day_posts)
+            for date_key in sorted(pending_days, reverse=True):
+                self._save_pending_day(date_key, pending_days[date_key])
 
-        print(f"\nBackup complete! Posts saved to {self.output_dir.absolute()}")
+            self._save_last_timestamp(last_timestamp)
+            self._save_attachment_index()
 
-        # Return collected YouTube URLs for playlist integration
-        return self.youtube_urls if self.add_to_youtube_playlist else []
+            logger.info("\nBackup complete! %d posts saved to %s", saved_count, self.output_dir.absolute())
+
+            # Return collected YouTube URLs for playlist integration
+            return self.youtube_urls if self.add_to_youtube_playlist else []
+        finally:
+            # Release pooled keep-alive connections
+            self.session.close()
+
+    def _save_pending_day(self, date_key: str, posts: List[Dict[str, Any]]) -> None:
+        """
+        Save a complete day's posts, oldest first
+
+        Args:
+            date_key: Date string in format YYYY/MM/DD
+            posts: All posts published on that day, in any order
+        """
+        logger.info("Saving %d post(s) for %s...", len(posts), date_key)
+        posts.sort(key=lambda p: p.get("timestamp", 0))
+        self.save_daily_posts(date_key, posts)
 
 
 def main():
     """
     Main function to run the backup
     """
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     # Load configuration
     config_file = Path("config.json")
 
     if not config_file.exists():
-        print("Error: config.json not found!")
-        print("Please create a config.json file with your Tumblr API credentials.")
-        print("See config.example.json for the required format.")
+        logger.error("Error: config.json not found!")
+        logger.error("Please create a config.json file with your Tumblr API credentials.")
+        logger.error("See config.example.json for the required format.")
         return
 
-    with open(config_file, "r") as f:
-        config = json.load(f)
+    config = _json_loads(config_file.read_bytes())
+    # Only adjust this project's loggers; library debug output can include request URLs with the API key
+    log_level = (config.get("log_level") or "INFO").upper()
+    logger.setLevel(log_level)
+    logging.getLogger("youtube_playlist").setLevel(log_level)
 
     blog_identifier = config.get("blog_identifier")
     api_key = config.get("api_key")
@@ -659,6 +1469,8 @@ def main():
     download_audio = config.get("download_audio", True)
     incremental_hours = config.get("incremental_hours", 5)  # Default 5 hours, set to None for full backup
     delete_after_backup = config.get("delete_after_backup", False)  # Default False, requires OAuth
+    fetch_workers = config.get("fetch_workers", 4)
+    download_workers = config.get("download_workers", 16)
 
     # YouTube playlist settings
     add_to_youtube_playlist = config.get("add_to_youtube_playlist", False)
@@ -666,6 +1478,7 @@ def main():
     youtube_client_id = config.get("youtube_client_id")
     youtube_client_secret = config.get("youtube_client_secret")
     youtube_refresh_token = config.get("youtube_refresh_token")
+    youtube_batch_size = config.get("youtube_batch_size", 50)
 
     # OAuth credentials for private blogs
     consumer_secret = config.get("consumer_secret")
@@ -673,17 +1486,17 @@ def main():
     oauth_token_secret = config.get("oauth_token_secret")
 
     if not blog_identifier or not api_key:
-        print("Error: blog_identifier and api_key are required in config.json")
+        logger.error("Error: blog_identifier and api_key are required in config.json")
         return
 
     # Validate OAuth if delete_after_backup is enabled
     if delete_after_backup and not all([consumer_secret, oauth_token, oauth_token_secret]):
-        print("Error: delete_after_backup requires OAuth credentials (consumer_secret, oauth_token, oauth_token_secret)")
+        logger.error("Error: delete_after_backup requires OAuth credentials (consumer_secret, oauth_token, oauth_token_secret)")
         return
 
     # Validate YouTube credentials if add_to_youtube_playlist is enabled
     if add_to_youtube_playlist and not all([youtube_playlist_id, youtube_client_id, youtube_client_secret]):
-        print("Error: add_to_youtube_playlist requires YouTube credentials (youtube_playlist_id, youtube_client_id, youtube_client_secret)")
+        logger.error("Error: add_to_youtube_playlist requires YouTube credentials (youtube_playlist_id, youtube_client_id, youtube_client_secret)")
         return
 
     # Create backup instance and run
@@ -699,7 +1512,9 @@ def main():
         oauth_token_secret,
         incremental_hours,
         delete_after_backup,
-        add_to_youtube_playlist
+        add_to_youtube_playlist,
+        fetch_workers,
+        download_workers
     )
     youtube_urls = backup.backup()
 
@@ -711,7 +1526,8 @@ def main():
             youtube_client_id,
             youtube_client_secret,
             youtube_playlist_id,
-            youtube_refresh_token
+            youtube_refresh_token,
+            youtube_batch_size
         )
 
 
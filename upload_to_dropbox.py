@@ -1,18 +1,33 @@
 import os
 import sys
+import threading
 import dropbox
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-def upload_folder_to_dropbox(local_folder, dropbox_path, refresh_token, app_key, app_secret):
+# Files above this size can't be sent in a single request and go through an upload session
+LARGE_FILE_THRESHOLD = 150 * 1024 * 1024
+
+# Files are read and sent in chunks of this size so only one chunk per upload is held in memory
+CHUNK_SIZE = 4 * 1024 * 1024  # 4MB chunks
+
+# Maximum number of uploads files_upload_session_finish_batch_v2 commits in one call
+FINISH_BATCH_SIZE = 1000
+
+def upload_folder_to_dropbox(local_folder, dropbox_path, refresh_token, app_key, app_secret, max_workers=8):
     """
     Upload all files from a local folder to Dropbox.
 
+    Files are uploaded concurrently. Small files are staged in closed upload sessions and
+    committed together in batches, large files are uploaded in chunks on their own.
+
     Args:
         local_folder: Path to local folder to upload
         dropbox_path: Destination path in Dropbox (e.g., '/Tumblr')
         refresh_token: Dropbox refresh token (never expires)
         app_key: Dropbox app key
         app_secret: Dropbox app secret
+        max_workers: Number of files to upload concurrently
     """
     dbx = dropbox.Dropbox(
         oauth2_refresh_token=refresh_token,
@@ -43,61 +58,128 @@ def upload_folder_to_dropbox(local_folder, dropbox_path, refresh_token, app_key,
             dropbox_path = f"/{dropbox_path}"
         dropbox_path = dropbox_path.rstrip("/")
 
-    # Upload all files in the folder
-    uploaded_count = 0
+    # Collect all files in the folder, setting aside those too large for a single request
+    small_files = []
+    large_files = []
     for file_path in local_path.rglob('*'):
         if file_path.is_file():
             # Calculate relative path for Dropbox
             relative_path = file_path.relative_to(local_path)
             dropbox_file_path = f"{dropbox_path}/{relative_path}".replace('\\', '/')
 
+            file_size = file_path.stat().st_size
+            if file_size > LARGE_FILE_THRESHOLD:
+                large_files.append((file_path, dropbox_file_path, file_size))
+            else:
+                small_files.append((file_path, dropbox_file_path))
+
+    uploaded_count = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Start the large files first since they take the longest
+        large_futures = {}
+        for file_path, dropbox_file_path, file_size in large_files:
+            print(f"Large file detected ({file_size} bytes), using upload session...")
+            future = executor.submit(upload_large_file_from_path, dbx, file_path, dropbox_file_path, file_size)
+            large_futures[future] = file_path
+
+        # Stage the small files and commit them in batches as they finish uploading
+        staged = []
+        small_futures = {
+            executor.submit(stage_small_file, dbx, file_path, dropbox_file_path): file_path
+            for file_path, dropbox_file_path in small_files
+        }
+        for future in as_completed(small_futures):
             try:
-                with open(file_path, 'rb') as f:
-                    file_size = file_path.stat().st_size
-
-                    # For files larger than 150MB, use upload session
-                    if file_size > 150 * 1024 * 1024:
-                        print(f"Large file detected ({file_size} bytes), using upload session...")
-                        upload_large_file(dbx, f, dropbox_file_path, file_size)
-                    else:
-                        # Regular upload for smaller files
-                        dbx.files_upload(
-                            f.read(),
-                            dropbox_file_path,
-                            mode=dropbox.files.WriteMode.overwrite
-                        )
-                    uploaded_count += 1
+                staged.append(future.result())
+            except Exception as e:
+                print(f"✗ Failed to upload {small_futures[future]}: {e}")
+                continue
 
+            if len(staged) == FINISH_BATCH_SIZE:
+                uploaded_count += commit_staged_files(dbx, staged)
+                staged = []
+
+        if staged:
+            uploaded_count += commit_staged_files(dbx, staged)
+
+        for future in as_completed(large_futures):
+            try:
+                future.result()
+                uploaded_count += 1
             except Exception as e:
-                print(f"✗ Failed to upload: {e}")
+                print(f"✗ Failed to upload {large_futures[future]}: {e}")
 
     print(f"\nUpload complete! {uploaded_count} file(s) uploaded to Dropbox.")
 
-def upload_large_file(dbx, file_obj, dropbox_path, file_size):
-    """Upload large files using upload session."""
-    CHUNK_SIZE = 4 * 1024 * 1024  # 4MB chunks
+def stage_small_file(dbx, file_path, dropbox_path):
+    """Upload a file chunk by chunk into a closed upload session so it can be committed in a batch."""
+    with open(file_path, 'rb') as f:
+        data = f.read(CHUNK_SIZE)
+        session_start = dbx.files_upload_session_start(data, close=len(data) < CHUNK_SIZE)
+        cursor = dropbox.files.UploadSessionCursor(
+            session_id=session_start.session_id,
+            offset=len(data)
+        )
+
+        # A full chunk means there may be more to send; a short (or empty) one closes the session
+        while len(data) == CHUNK_SIZE:
+            data = f.read(CHUNK_SIZE)
+            dbx.files_upload_session_append_v2(data, cursor, close=len(data) < CHUNK_SIZE)
+            cursor.offset += len(data)
 
-    session_start = dbx.files_upload_session_start(file_obj.read(CHUNK_SIZE))
-    cursor = dropbox.files.UploadSessionCursor(
-        session_id=session_start.session_id,
-        offset=file_obj.tell()
-    )
     commit = dropbox.files.CommitInfo(path=dropbox_path, mode=dropbox.files.WriteMode.overwrite)
+    return dropbox.files.UploadSessionFinishArg(cursor=cursor, commit=commit)
 
-    while file_obj.tell() < file_size:
-        if (file_size - file_obj.tell()) <= CHUNK_SIZE:
-            # Last chunk
-            dbx.files_upload_session_finish(
-                file_obj.read(CHUNK_SIZE),
-                cursor,
-                commit
-            )
+def commit_staged_files(dbx, entries):
+    """Commit a batch of staged uploads and return how many succeeded."""
+    try:
+        result = dbx.files_upload_session_finish_batch_v2(entries)
+    except Exception as e:
+        for entry in entries:
+            print(f"✗ Failed to upload {entry.commit.path}: {e}")
+        return 0
+
+    committed = 0
+    for entry, entry_result in zip(entries, result.entries):
+        if entry_result.is_success():
+            committed += 1
         else:
-            dbx.files_upload_session_append_v2(
-                file_obj.read(CHUNK_SIZE),
-                cursor
-            )
-            cursor.offset = file_obj.tell()
+            print(f"✗ Failed to upload {entry.commit.path}: {entry_result.get_failure()}")
+    return committed
+
+def upload_large_file_from_path(dbx, file_path, dropbox_path, file_size):
+    """Open a large file and upload it using an upload session."""
+    with open(file_path, 'rb') as f:
+        upload_large_file(dbx, f, dropbox_path, file_size)
+
+def upload_large_file(dbx, file_obj, dropbox_path, file_size, max_workers=4):
+    """Upload large files using a concurrent upload session, sending several chunks at once."""
+    session_start = dbx.files_upload_session_start(
+        b'',
+        session_type=dropbox.files.UploadSessionType.concurrent
+    )
+    session_id = session_start.session_id
+    read_lock = threading.Lock()
+
+    def append_chunk(offset, close=False):
+        # Workers share one file handle, so each seek+read must happen together
+        with read_lock:
+            file_obj.seek(offset)
+            data = file_obj.read(CHUNK_SIZE)
+        cursor = dropbox.files.UploadSessionCursor(session_id=session_id, offset=offset)
+        dbx.files_upload_session_append_v2(data, cursor, close=close)
+
+    # Every chunk but the last is a whole CHUNK_SIZE, as concurrent sessions require
+    offsets = range(0, file_size, CHUNK_SIZE)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(append_chunk, offsets[:-1]))
+
+    # The last chunk closes the session, so it is only sent once all the others have landed
+    append_chunk(offsets[-1], close=True)
+
+    cursor = dropbox.files.UploadSessionCursor(session_id=session_id, offset=file_size)
+    commit = dropbox.files.CommitInfo(path=dropbox_path, mode=dropbox.files.WriteMode.overwrite)
+    dbx.files_upload_session_finish(b'', cursor, commit)
 
 if __name__ == "__main__":
     # Get configuration from environment variables
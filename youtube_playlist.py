@@ -3,16 +3,35 @@ YouTube Playlist Integration
 Handles adding videos to a YouTube playlist using the YouTube Data API v3
 """
 
+import logging
 import os
 import re
-import pickle
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+# Video ID in watch, short, embed and /v/ URLs, matched in a single pass
+VIDEO_ID_PATTERN = re.compile(r'(?:youtube\.com\/(?:watch\?v=|embed\/|v\/)|youtu\.be\/)([a-zA-Z0-9_-]{11})')
+
+
+@lru_cache(maxsize=65536)
+def _extract_video_id(url: str) -> Optional[str]:
+    """
+    Extract a YouTube video ID from a URL, cached since the same URLs are seen repeatedly
+    """
+    # Every supported format contains "youtu", so skip the regex for anything else
+    if 'youtu' not in url:
+        return None
+    match = VIDEO_ID_PATTERN.search(url)
+    return match.group(1) if match else None
 
 
 class YouTubePlaylistManager:
@@ -20,7 +39,17 @@ class YouTubePlaylistManager:
 
     SCOPES = ['https://www.googleapis.com/auth/youtube']
 
-    def __init__(self, client_id: str, client_secret: str, playlist_id: str, refresh_token: Optional[str] = None):
+    # Authenticated API clients shared by managers using the same credentials
+    _services: Dict[Tuple[str, str, Optional[str]], Any] = {}
+
+    # Maximum number of calls the API accepts in one batch request
+    BATCH_SIZE = 50
+
+    # Retries with exponential backoff for rate-limited or failed (429/5xx) calls
+    NUM_RETRIES = 5
+
+    def __init__(self, client_id: str, client_secret: str, playlist_id: str, refresh_token: Optional[str] = None,
+                 batch_size: int = BATCH_SIZE):
         """
         Initialize YouTube playlist manager
 
@@ -29,16 +58,33 @@ class YouTubePlaylistManager:
             client_secret: Google OAuth2 client secret
             playlist_id: YouTube playlist ID to add videos to
             refresh_token: Optional refresh token for headless authentication (GitHub Actions)
+            batch_size: Number of API calls sent together in one batch request (1-50, default: 50)
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.playlist_id = playlist_id
         self.refresh_token = refresh_token
+        self.batch_size = max(1, min(batch_size, self.BATCH_SIZE))
         self.youtube = None
         self._authenticate()
 
     def _authenticate(self) -> None:
-        """Authenticate with YouTube API using OAuth2"""
+        """Authenticate with YouTube API using OAuth2, reusing the client of an earlier manager if possible"""
+        # The client refreshes its access token by itself when it expires, so it can be kept for the process
+        key = (self.client_id, self.client_secret, self.refresh_token)
+        service = self._services.get(key)
+        if service is None:
+            service = self._build_service()
+            self._services[key] = service
+        self.youtube = service
+
+    def _build_service(self) -> Any:
+        """
+        Obtain credentials and build an authenticated YouTube API client
+
+        Returns:
+            YouTube Data API v3 service
+        """
         creds = None
 
         # If refresh token provided, use it directly (for GitHub Actions)
@@ -55,12 +101,11 @@ class YouTubePlaylistManager:
             creds.refresh(Request())
         else:
             # Interactive authentication with token caching
-            token_file = Path('youtube_token.pickle')
+            token_file = Path('youtube_token.json')
 
             # Load existing credentials
             if token_file.exists():
-                with open(token_file, 'rb') as token:
-                    creds = pickle.load(token)
+                creds = Credentials.from_authorized_user_file(str(token_file), self.SCOPES)
 
             # If no valid credentials, get new ones
             if not creds or not creds.valid:
@@ -82,10 +127,10 @@ class YouTubePlaylistManager:
                     creds = flow.run_local_server(port=0)
 
                 # Save credentials for next run
-                with open(token_file, 'wb') as token:
-                    pickle.dump(creds, token)
+                token_file.write_text(creds.to_json(), encoding='utf-8')
 
-        self.youtube = build('youtube', 'v3', credentials=creds)
+        # Use the discovery document bundled with the client library instead of fetching it
+        return build('youtube', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
 
     def extract_video_id(self, url: str) -> Optional[str]:
         """
@@ -97,27 +142,20 @@ class YouTubePlaylistManager:
         Returns:
             Video ID if found, None otherwise
         """
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/)([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/embed\/([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/v\/([a-zA-Z0-9_-]{11})',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+        return _extract_video_id(url)
 
-        return None
-
-    def get_playlist_video_ids(self) -> Set[str]:
+    def get_playlist_video_ids(self, wanted: Optional[Set[str]] = None) -> Set[str]:
         """
         Get all video IDs currently in the playlist
 
+        Args:
+            wanted: Optional video IDs of interest; paging stops early once all of them are found
+
         Returns:
             Set of video IDs
         """
         video_ids = set()
+        missing = set(wanted) if wanted is not None else None
         next_page_token = None
 
         try:
@@ -128,22 +166,72 @@ class YouTubePlaylistManager:
                     maxResults=50,
                     pageToken=next_page_token
                 )
-                response = request.execute()
+                response = request.execute(num_retries=self.NUM_RETRIES)
 
                 for item in response.get('items', []):
                     video_id = item['contentDetails']['videoId']
                     video_ids.add(video_id)
+                    if missing is not None:
+                        missing.discard(video_id)
+
+                # Every video we asked about is already known to be in the playlist
+                if missing is not None and not missing:
+                    break
 
                 next_page_token = response.get('nextPageToken')
                 if not next_page_token:
                     break
 
         except HttpError as e:
-            print(f"Warning: Failed to fetch existing playlist items: {e}")
+            logger.warning("Warning: Failed to fetch existing playlist items: %s", e)
 
         return video_ids
 
-    def add_video_to_playlist(self, video_id: str) -> bool:
+    def find_videos_in_playlist(self, video_ids: List[str]) -> Set[str]:
+        """
+        Check which of the given videos are already in the playlist
+
+        Each video is looked up directly with a videoId-filtered list call, sent in batch
+        requests, so the cost depends on the number of candidates rather than the playlist size.
+
+        Args:
+            video_ids: YouTube video IDs to look for
+
+        Returns:
+            Set of the given video IDs that are in the playlist
+        """
+        found = set()
+        errors = []
+
+        def on_response(video_id, response, exception):
+            if exception is not None:
+                errors.append(exception)
+            elif response.get('items'):
+                found.add(video_id)
+
+        try:
+            for start in range(0, len(video_ids), self.batch_size):
+                batch = self.youtube.new_batch_http_request(callback=on_response)
+                for video_id in video_ids[start:start + self.batch_size]:
+                    request = self.youtube.playlistItems().list(
+                        part='id',
+                        playlistId=self.playlist_id,
+                        videoId=video_id,
+                        maxResults=1
+                    )
+                    batch.add(request, request_id=video_id)
+                batch.execute()
+        except HttpError as e:
+            errors.append(e)
+
+        # Playlists accept duplicates, so if any lookup failed fall back to reading the whole playlist
+        if errors:
+            logger.warning("Warning: Failed to look up videos in playlist, reading all items instead: %s", errors[0])
+            return self.get_playlist_video_ids(set(video_ids))
+
+        return found
+
+    def add_video_to_playlist(self, video_id: str) -> str:
         """
         Add a single video to the playlist
 
@@ -151,33 +239,91 @@ class YouTubePlaylistManager:
             video_id: YouTube video ID
 
         Returns:
-            True if successful, False otherwise
+            'added' if successful, 'skipped' if it was already in the playlist, 'failed' otherwise
         """
         try:
-            request = self.youtube.playlistItems().insert(
-                part='snippet',
-                body={
-                    'snippet': {
-                        'playlistId': self.playlist_id,
-                        'resourceId': {
-                            'kind': 'youtube#video',
-                            'videoId': video_id
-                        }
+            self._insert_request(video_id).execute(num_retries=self.NUM_RETRIES)
+            return 'added'
+
+        except HttpError as e:
+            # Video already in playlist is not a real error
+            if self._error_reason(e) == 'videoAlreadyInPlaylist':
+                return 'skipped'
+
+            logger.warning("Warning: Failed to add video %s: %s", video_id, e)
+            return 'failed'
+
+    def _insert_request(self, video_id: str) -> HttpRequest:
+        """
+        Build the API request that appends a video to the playlist
+
+        Args:
+            video_id: YouTube video ID
+
+        Returns:
+            Unexecuted playlistItems.insert request
+        """
+        return self.youtube.playlistItems().insert(
+            part='snippet',
+            body={
+                'snippet': {
+                    'playlistId': self.playlist_id,
+                    'resourceId': {
+                        'kind': 'youtube#video',
+                        'videoId': video_id
                     }
                 }
-            )
-            request.execute()
-            return True
+            }
+        )
 
-        except HttpError as e:
-            error_reason = e.error_details[0].get('reason', '') if e.error_details else ''
+    @staticmethod
+    def _error_reason(error: HttpError) -> str:
+        """
+        Get the API's reason code from an HTTP error
 
-            # Video already in playlist is not a real error
-            if error_reason == 'videoAlreadyInPlaylist':
-                return False
+        Args:
+            error: Error raised by the API client
+
+        Returns:
+            Reason code such as 'videoAlreadyInPlaylist', or an empty string if there is none
+        """
+        return error.error_details[0].get('reason', '') if error.error_details else ''
+
+    def _insert_batch(self, video_ids: List[str], results: dict) -> List[str]:
+        """
+        Add up to batch_size videos to the playlist in a single batch request
 
-            print(f"Warning: Failed to add video {video_id}: {e}")
-            return False
+        Args:
+            video_ids: YouTube video IDs to add
+            results: Result counters to update for every video that is settled
+
+        Returns:
+            Video IDs that failed and may be retried individually
+        """
+        retry_ids = []
+        settled = set()
+
+        def on_response(video_id, response, exception):
+            settled.add(video_id)
+            if exception is None:
+                results['added'] += 1
+                logger.debug("Added video: %s", video_id)
+            elif isinstance(exception, HttpError) and self._error_reason(exception) == 'videoAlreadyInPlaylist':
+                results['skipped'] += 1
+            else:
+                retry_ids.append(video_id)
+
+        batch = self.youtube.new_batch_http_request(callback=on_response)
+        for video_id in video_ids:
+            batch.add(self._insert_request(video_id), request_id=video_id)
+
+        try:
+            batch.execute()
+        except HttpError as e:
+            logger.warning("Warning: Batch request failed: %s", e)
+            retry_ids.extend(video_id for video_id in video_ids if video_id not in settled)
+
+        return retry_ids
 
     def add_videos_to_playlist(self, video_urls: List[str]) -> dict:
         """
@@ -191,38 +337,37 @@ class YouTubePlaylistManager:
         """
         results = {'added': 0, 'skipped': 0, 'failed': 0}
 
-        # Extract video IDs from URLs
-        video_ids = []
-        for url in video_urls:
-            video_id = self.extract_video_id(url)
-            if video_id:
-                video_ids.append(video_id)
+        # Extract video IDs from each distinct URL, keeping each video once in first-seen order
+        video_ids = list(dict.fromkeys(filter(None, map(self.extract_video_id, dict.fromkeys(video_urls)))))
 
         if not video_ids:
             return results
 
         # Get existing playlist items to avoid duplicates
-        print(f"Checking playlist for existing videos...")
-        existing_ids = self.get_playlist_video_ids()
+        logger.info("Checking playlist for existing videos...")
+        existing_ids = self.find_videos_in_playlist(video_ids)
 
-        # Add videos
-        for video_id in video_ids:
-            if video_id in existing_ids:
-                results['skipped'] += 1
-                continue
+        new_ids = [video_id for video_id in video_ids if video_id not in existing_ids]
+        results['skipped'] += len(video_ids) - len(new_ids)
 
-            if self.add_video_to_playlist(video_id):
-                results['added'] += 1
-                print(f"Added video: {video_id}")
-            else:
-                results['failed'] += 1
+        # Add videos in batches, then retry any that failed one at a time
+        retry_ids = []
+        for start in range(0, len(new_ids), self.batch_size):
+            retry_ids.extend(self._insert_batch(new_ids[start:start + self.batch_size], results))
+
+        for video_id in retry_ids:
+            outcome = self.add_video_to_playlist(video_id)
+            results[outcome] += 1
+            if outcome == 'added':
+                logger.debug("Added video: %s", video_id)
 
         return results
 
 
 def add_youtube_videos_to_playlist(video_urls: List[str], client_id: str,
                                    client_secret: str, playlist_id: str,
-                                   refresh_token: Optional[str] = None) -> None:
+                                   refresh_token: Optional[str] = None,
+                                   batch_size: int = YouTubePlaylistManager.BATCH_SIZE) -> None:
     """
     Convenience function to add YouTube videos to a playlist
 
@@ -232,22 +377,23 @@ def add_youtube_videos_to_playlist(video_urls: List[str], client_id: str,
         client_secret: Google OAuth2 client secret
         playlist_id: YouTube playlist ID
         refresh_token: Optional refresh token for headless authentication
+        batch_size: Number of API calls sent together in one batch request
     """
     if not video_urls:
-        print("No YouTube videos to add to playlist")
+        logger.info("No YouTube videos to add to playlist")
         return
 
-    print(f"\nAdding {len(video_urls)} YouTube video(s) to playlist...")
+    logger.info("\nAdding %d YouTube video(s) to playlist...", len(video_urls))
 
     try:
-        manager = YouTubePlaylistManager(client_id, client_secret, playlist_id, refresh_token)
+        manager = YouTubePlaylistManager(client_id, client_secret, playlist_id, refresh_token, batch_size)
         results = manager.add_videos_to_playlist(video_urls)
 
-        print(f"\nYouTube playlist update complete:")
-        print(f"  Added: {results['added']}")
-        print(f"  Already in playlist: {results['skipped']}")
+        logger.info("\nYouTube playlist update complete:")
+        logger.info("  Added: %d", results['added'])
+        logger.info("  Already in playlist: %d", results['skipped'])
         if results['failed'] > 0:
-            print(f"  Failed: {results['failed']}")
+            logger.info("  Failed: %d", results['failed'])
 
     except Exception as e:
-        print(f"Error adding videos to YouTube playlist: {e}")
+        logger.error("Error adding videos to YouTube playlist: %s", e)